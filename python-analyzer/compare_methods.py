@@ -6,7 +6,8 @@ Compare different complexity calculation methods
 import ast
 import sys
 import json
-from complexity_analyzer import analyze_file
+from collections import Counter
+from complexity_analyzer import PRESETS, analyze_file
 
 
 def analyze_with_config(file_path, config):
@@ -19,162 +20,140 @@ def analyze_with_config(file_path, config):
 def compare_methods(file_path):
     """Compare different complexity calculation methods"""
     
-    methods = {
-        'strict': {
-            'name': 'Strict McCabe',
-            'description': 'Original McCabe complexity (minimal)',
-            'config': {
-                'countIf': True,
-                'countWhile': True,
-                'countFor': True,
-                'countExcept': True,
-                'countAssert': False,
-                'countBoolOp': False,  # Don't count individual operators
-                'countTernary': True,
-                'countComprehension': False,  # Don't count comprehensions
-                'countComprehensionIf': False,
-                'countMatch': True,
-            }
-        },
-        'standard': {
-            'name': 'Standard',
-            'description': 'Common industry standard',
-            'config': {
-                'countIf': True,
-                'countWhile': True,
-                'countFor': True,
-                'countExcept': True,
-                'countAssert': False,
-                'countBoolOp': True,
-                'countTernary': True,
-                'countComprehension': True,
-                'countComprehensionIf': True,
-                'countMatch': True,
-            }
-        },
-        'comprehensive': {
-            'name': 'Comprehensive',
-            'description': 'Counts everything (most conservative)',
-            'config': {
-                'countIf': True,
-                'countWhile': True,
-                'countFor': True,
-                'countExcept': True,
-                'countAssert': True,
-                'countBoolOp': True,
-                'countTernary': True,
-                'countComprehension': True,
-                'countComprehensionIf': True,
-                'countMatch': True,
-                'countWith': True,
-            }
-        }
-    }
-    
-    # Analyze once (we'll show different perspectives)
-    result = analyze_file(file_path)
+    # Analyze once with every event type counted; each preset's score is
+    # then composed from the per-type buckets without re-walking the AST
+    result = analyze_file(file_path, PRESETS['comprehensive'])
     
     if not result.get('success'):
         print(json.dumps(result))
         return
     
-    print("\n" + "=" * 80)
-    print(f"Complexity Comparison: {file_path}")
-    print("=" * 80 + "\n")
-    
+    # Buffer all lines and flush once - avoids per-print write overhead
+    out = []
+    line = out.append
+
+    line("\n" + "=" * 80)
+    line(f"Complexity Comparison: {file_path}")
+    line("=" * 80 + "\n")
+
     # Show what each method counts
-    print("Method Comparison:\n")
-    for method_id, method in methods.items():
-        print(f"{method['name']:20s} - {method['description']}")
-    
-    print("\n" + "=" * 80)
-    print(f"{'Function':<40s} {'Current':<10s} {'Notes'}")
-    print("=" * 80)
-    
+    line("Method Comparison:\n")
+    for preset_id, preset in PRESETS.items():
+        line(f"{preset['name']:30s} - {preset['description']}")
+
+    line("\n" + "=" * 80)
+    line(f"{'Function':<40s} {'Strict':<8s} {'Std':<8s} {'Compr':<8s} {'Notes'}")
+    line("=" * 80)
+
+    standard_scores = []
     for func in result['functions']:
-        complexity = func['complexity']
+        scores = preset_complexities(func)
+        complexity = scores['standard']
+        standard_scores.append(complexity)
         name = ('async ' if func['is_async'] else '') + func['name']
         name = name[:38] + '..' if len(name) > 40 else name
-        
-        # Estimate what strict method would give (rough approximation)
-        # In a full implementation, we'd recalculate with each config
-        strict_estimate = estimate_strict_complexity(func)
-        
+
         notes = ""
         if complexity > 20:
             notes = "⚠️  Very High"
         elif complexity > 15:
             notes = "⚡ High"
-        
-        print(f"{name:<40s} {complexity:<10d} {notes}")
-        
-        # Show breakdown if available
-        if func.get('details') and len(func['details']) > 0:
-            # Count types
-            type_counts = {}
-            for detail in func['details']:
-                dtype = detail['type']
-                type_counts[dtype] = type_counts.get(dtype, 0) + detail['amount']
-            
+
+        line(f"{name:<40s} {scores['strict_mccabe']:<8d} {complexity:<8d} "
+             f"{scores['comprehensive']:<8d} {notes}")
+
+        # Show breakdown if available (type_totals is precomputed by the counter)
+        type_counts = Counter(func.get('type_totals') or {})
+        if type_counts:
+            if_count = type_counts['if']
+            loop_count = type_counts['for'] + type_counts['while']
+            bool_op_count = type_counts['bool_op']
+            list_comp_count = type_counts['list_comp']
+
             breakdown_items = []
-            if type_counts.get('if', 0) > 0:
-                breakdown_items.append(f"if/elif: {type_counts['if']}")
-            if type_counts.get('for', 0) > 0:
-                breakdown_items.append(f"loops: {type_counts['for'] + type_counts.get('while', 0)}")
-            if type_counts.get('bool_op', 0) > 0:
-                breakdown_items.append(f"and/or: {type_counts['bool_op']}")
-            if type_counts.get('list_comp', 0) > 0:
-                comp_total = (type_counts.get('list_comp', 0) + 
-                             type_counts.get('dict_comp', 0) + 
-                             type_counts.get('set_comp', 0))
+            if if_count > 0:
+                breakdown_items.append(f"if/elif: {if_count}")
+            if type_counts['for'] > 0:
+                breakdown_items.append(f"loops: {loop_count}")
+            if bool_op_count > 0:
+                breakdown_items.append(f"and/or: {bool_op_count}")
+            if list_comp_count > 0:
+                comp_total = (list_comp_count +
+                             type_counts['dict_comp'] +
+                             type_counts['set_comp'])
                 breakdown_items.append(f"comprehensions: {comp_total}")
-            
+
             if breakdown_items:
-                print(f"  └─ {', '.join(breakdown_items)}")
-        
-        print()
-    
-    print("=" * 80)
-    print(f"\nTotal functions: {result['total_functions']}")
-    avg = sum(f['complexity'] for f in result['functions']) / len(result['functions']) if result['functions'] else 0
-    print(f"Average complexity: {avg:.2f}")
-    
-    # Show distribution
-    low = sum(1 for f in result['functions'] if f['complexity'] <= 10)
-    medium = sum(1 for f in result['functions'] if 10 < f['complexity'] <= 15)
-    high = sum(1 for f in result['functions'] if 15 < f['complexity'] <= 20)
-    very_high = sum(1 for f in result['functions'] if f['complexity'] > 20)
-    
-    print(f"\nComplexity Distribution:")
-    print(f"  ✅ Low (1-10):      {low:3d} functions")
-    print(f"  ⚡ Medium (11-15):  {medium:3d} functions")
-    print(f"  ⚠️  High (16-20):    {high:3d} functions")
-    print(f"  🚨 Very High (>20): {very_high:3d} functions")
-    
-    print("\n" + "=" * 80)
-    print("\nNote: Different tools use different methods:")
-    print("  - Radon (Python): Similar to 'standard'")
-    print("  - SonarQube: Uses 'comprehensive' approach")
-    print("  - McCabe original: Close to 'strict'")
-    print("  - This tool: Uses 'standard' (industry common)")
-    print("\n")
-
-
-def estimate_strict_complexity(func):
-    """Estimate what strict McCabe would calculate"""
-    # This is a rough estimate - doesn't count bool ops, comprehensions
-    if not func.get('details'):
-        return func['complexity']
-    
-    strict = 1  # Base
-    for detail in func['details']:
-        dtype = detail['type']
-        # Only count basic control flow
-        if dtype in ['if', 'while', 'for', 'except', 'ternary', 'match_case']:
-            strict += detail['amount']
-        # Skip bool_op, comprehensions, etc.
-    
-    return strict
+                line(f"  └─ {', '.join(breakdown_items)}")
+
+        line("")
+
+    line("=" * 80)
+    line(f"\nTotal functions: {result['total_functions']}")
+
+    # Average and distribution (standard scores) in a single pass
+    total = low = medium = high = very_high = 0
+    for c in standard_scores:
+        total += c
+        if c <= 10:
+            low += 1
+        elif c <= 15:
+            medium += 1
+        elif c <= 20:
+            high += 1
+        else:
+            very_high += 1
+
+    avg = total / len(result['functions']) if result['functions'] else 0
+    line(f"Average complexity: {avg:.2f}")
+
+    line(f"\nComplexity Distribution:")
+    line(f"  ✅ Low (1-10):      {low:3d} functions")
+    line(f"  ⚡ Medium (11-15):  {medium:3d} functions")
+    line(f"  ⚠️  High (16-20):    {high:3d} functions")
+    line(f"  🚨 Very High (>20): {very_high:3d} functions")
+
+    line("\n" + "=" * 80)
+    line("\nNote: Different tools use different methods:")
+    line("  - Radon (Python): Similar to 'standard'")
+    line("  - SonarQube: Uses 'comprehensive' approach")
+    line("  - McCabe original: Close to 'strict'")
+    line("  - This tool: Uses 'standard' (industry common)")
+    line("\n")
+
+    sys.stdout.write('\n'.join(out) + '\n')
+
+
+# Detail type -> config flag that gates it
+TYPE_FLAGS = {
+    'if': 'countIf',
+    'while': 'countWhile',
+    'for': 'countFor',
+    'except': 'countExcept',
+    'assert': 'countAssert',
+    'with': 'countWith',
+    'ternary': 'countTernary',
+    'bool_op': 'countBoolOp',
+    'list_comp': 'countComprehension',
+    'set_comp': 'countComprehension',
+    'dict_comp': 'countComprehension',
+    'gen_exp': 'countComprehension',
+    'comp_if': 'countComprehensionIf',
+    'match_case': 'countMatch',
+}
+
+# Preset name -> frozen set of detail types that preset counts
+FROZEN_PRESETS = {
+    name: frozenset(t for t, flag in TYPE_FLAGS.items() if preset.get(flag, True))
+    for name, preset in PRESETS.items()
+}
+
+
+def preset_complexities(func):
+    """Compose every preset's score from the per-type buckets"""
+    buckets = func.get('type_totals') or {}
+    return {name: 1 + sum(amount for t, amount in buckets.items() if t in types)
+            for name, types in FROZEN_PRESETS.items()}
 
 
 def main():
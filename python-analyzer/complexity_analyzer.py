@@ -5,11 +5,12 @@ This script is called by the VS Code extension to analyze Python files
 """
 
 import ast
+import functools
 import sys
 import json
 import os
-from typing import Dict, List, Any, Tuple, Optional
-from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, List, Any, NamedTuple, Tuple, Optional
 
 
 # Configuration presets
@@ -62,25 +63,94 @@ PRESETS = {
 }
 
 
-@dataclass
+# Config dict key -> Cfg field name
+CONFIG_FIELDS = {
+    'countIf': 'count_if',
+    'countWhile': 'count_while',
+    'countFor': 'count_for',
+    'countExcept': 'count_except',
+    'countAssert': 'count_assert',
+    'countWith': 'count_with',
+    'countTernary': 'count_ternary',
+    'countBoolOp': 'count_bool_op',
+    'countComprehension': 'count_comp',
+    'countComprehensionIf': 'count_comp_if',
+    'countMatch': 'count_match',
+}
+
+
+class Cfg(NamedTuple):
+    """Configuration flags frozen into a tuple for attribute-speed access"""
+    count_if: bool = True
+    count_while: bool = True
+    count_for: bool = True
+    count_except: bool = True
+    count_assert: bool = True
+    count_with: bool = True
+    count_ternary: bool = True
+    count_bool_op: bool = True
+    count_comp: bool = True
+    count_comp_if: bool = True
+    count_match: bool = True
+
+    @classmethod
+    def from_dict(cls, config: Dict) -> 'Cfg':
+        """Build from a camelCase config dict (unknown keys ignored)"""
+        return cls(**{field: bool(config.get(key, True))
+                      for key, field in CONFIG_FIELDS.items()})
+
+
+# Interned detail strings - every detail and type_totals key shares one
+# object, so dict lookups compare by pointer and JSON payloads deduplicate
+_BOOL_OP = sys.intern('bool_op')
+_LIST_COMP = sys.intern('list_comp')
+_LIST_COMP_DESC = sys.intern('list comprehension')
+_SET_COMP = sys.intern('set_comp')
+_SET_COMP_DESC = sys.intern('set comprehension')
+_DICT_COMP = sys.intern('dict_comp')
+_DICT_COMP_DESC = sys.intern('dict comprehension')
+_GEN_EXP = sys.intern('gen_exp')
+_GEN_EXP_DESC = sys.intern('generator expression')
+_COMP_IF = sys.intern('comp_if')
+_COMP_IF_DESC = sys.intern('comprehension if')
+_MATCH_CASE = sys.intern('match_case')
+_MATCH_CASE_DESC = sys.intern('match case')
+
+
+def _dump_json(obj: Any) -> str:
+    """Serialize for stdout: compact separators, no ASCII escaping"""
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False)
+
+
 class ComplexityDetail:
     """Detail about a single decision point"""
-    type: str
-    line: int
-    amount: int
-    description: str
+    __slots__ = ('type', 'line', 'amount', 'description')
+
+    def __init__(self, type: str, line: int, amount: int, description: str):
+        self.type = type
+        self.line = line
+        self.amount = amount
+        self.description = description
 
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        return {
+            'type': self.type,
+            'line': self.line,
+            'amount': self.amount,
+            'description': self.description,
+        }
 
 
 class ComplexityVisitor(ast.NodeVisitor):
     """AST visitor that finds and analyzes functions"""
     
-    def __init__(self, config: Optional[Dict] = None):
+    def __init__(self, config: Optional[Dict] = None, collect_details: bool = True):
         self.functions = []
         self.current_function = None
         self.config = config or PRESETS['standard']
+        self.collect_details = collect_details
+        # One counter reused (via reset) for every function in the file
+        self._counter = ComplexityCounter(self.config, collect_details=collect_details)
         
     def visit_FunctionDef(self, node):
         """Visit regular function definition"""
@@ -110,10 +180,13 @@ class ComplexityVisitor(ast.NodeVisitor):
         self.current_function = function_info
         
         # Calculate complexity
-        counter = ComplexityCounter(self.config, collect_details=True)
-        counter.visit(node)
+        counter = self._counter
+        counter.reset()
+        counter.count(node)
         function_info['complexity'] = counter.complexity
-        function_info['details'] = [d.to_dict() for d in counter.details]
+        function_info['type_totals'] = dict(counter.type_totals)
+        if self.collect_details:
+            function_info['details'] = [d.to_dict() for d in counter.details]
         
         # Add to results
         self.functions.append(function_info)
@@ -122,7 +195,7 @@ class ComplexityVisitor(ast.NodeVisitor):
         self.current_function = parent_function
 
 
-class ComplexityCounter(ast.NodeVisitor):
+class ComplexityCounter:
     """Counts complexity using a registry-based approach"""
     
     # Handler registry: node_type -> (type_name, description, config_key)
@@ -136,86 +209,129 @@ class ComplexityCounter(ast.NodeVisitor):
         ast.IfExp: ('ternary', 'ternary expression', 'countTernary'),
     }
     
+    # Every node type with a dedicated visit_X method (ast.Match needs 3.10+)
+    HANDLED_TYPES = tuple(SIMPLE_HANDLERS) + tuple(
+        t for t in (ast.BoolOp, ast.ListComp, ast.SetComp, ast.DictComp,
+                    ast.GeneratorExp, getattr(ast, 'Match', None))
+        if t is not None)
+
     def __init__(self, config: Dict, collect_details: bool = True):
         self.complexity = 1  # Base complexity
         self.config = config
         self.collect_details = collect_details
         self.details: List[ComplexityDetail] = []
-        
+        self.type_totals: Dict[str, int] = {}
+        # Resolve config flags once; the per-node checks become tuple-slot loads
+        self.cfg = config if isinstance(config, Cfg) else Cfg.from_dict(config)
+        # Pre-resolve {node type: bound handler} so visit() is a single
+        # dict lookup instead of NodeVisitor's per-node getattr dance
+        self._dispatch = {
+            node_class: getattr(self, 'visit_' + node_class.__name__)
+            for node_class in self.HANDLED_TYPES
+        }
+
+    def count(self, node):
+        """Count a whole subtree iteratively - ast.walk yields every
+        descendant, so handlers look at single nodes and never recurse"""
+        dispatch = self._dispatch
+        for child in ast.walk(node):
+            handler = dispatch.get(type(child))
+            if handler is not None:
+                handler(child)
+
+    def reset(self):
+        """Reset counts so the same counter can be reused for another function"""
+        self.complexity = 1
+        self.details.clear()
+        self.type_totals.clear()
+
     def _add_complexity(self, amount: int, node_type: str, line: int, description: str = ""):
         """Add complexity and optionally track details"""
         self.complexity += amount
+        totals = self.type_totals
+        totals[node_type] = totals.get(node_type, 0) + amount
         if self.collect_details:
             self.details.append(ComplexityDetail(node_type, line, amount, description))
     
-    def visit(self, node):
-        """Override visit to handle simple nodes dynamically"""
-        # Check if this is a simple handler
-        for node_class, (type_name, desc, config_key) in self.SIMPLE_HANDLERS.items():
-            if isinstance(node, node_class):
-                if self.config.get(config_key, True):
-                    line = getattr(node, 'lineno', 0)
-                    self._add_complexity(1, type_name, line, desc)
-                break
-        
-        # Continue traversal
-        self.generic_visit(node)
-    
     def visit_BoolOp(self, node):
         """Boolean operators (and, or)"""
-        if self.config.get('countBoolOp', True):
+        if self.cfg.count_bool_op:
             if isinstance(node.op, (ast.And, ast.Or)):
                 op_name = 'and' if isinstance(node.op, ast.And) else 'or'
                 amount = len(node.values) - 1
                 self._add_complexity(
                     amount,
-                    'bool_op',
+                    _BOOL_OP,
                     node.lineno,
                     f'{amount} {op_name} operator(s)'
                 )
-        self.generic_visit(node)
     
     def visit_ListComp(self, node):
         """List comprehension"""
-        self._handle_comprehension(node, 'list_comp', 'list comprehension')
-        self.generic_visit(node)
+        self._handle_comprehension(node, _LIST_COMP, _LIST_COMP_DESC)
     
     def visit_SetComp(self, node):
         """Set comprehension"""
-        self._handle_comprehension(node, 'set_comp', 'set comprehension')
-        self.generic_visit(node)
+        self._handle_comprehension(node, _SET_COMP, _SET_COMP_DESC)
     
     def visit_DictComp(self, node):
         """Dict comprehension"""
-        self._handle_comprehension(node, 'dict_comp', 'dict comprehension')
-        self.generic_visit(node)
+        self._handle_comprehension(node, _DICT_COMP, _DICT_COMP_DESC)
     
     def visit_GeneratorExp(self, node):
         """Generator expression"""
-        self._handle_comprehension(node, 'gen_exp', 'generator expression')
-        self.generic_visit(node)
+        self._handle_comprehension(node, _GEN_EXP, _GEN_EXP_DESC)
     
     def _handle_comprehension(self, node, comp_type: str, description: str):
-        """Unified comprehension handler - eliminates duplication!"""
-        if not self.config.get('countComprehension', True):
+        """Unified comprehension handler - eliminates duplication!
+
+        Only reads generator structure; traversal of child expressions
+        (nested comprehensions, bool ops in if clauses) is left entirely to
+        the walk in count(), so nothing is counted twice.
+        """
+        if not self.cfg.count_comp:
             return
-            
+
+        # Locals instead of repeated attribute loads inside the loops
+        add = self._add_complexity
+        lineno = node.lineno
+        count_ifs = self.cfg.count_comp_if
         for comp in node.generators:
-            self._add_complexity(1, comp_type, node.lineno, description)
-            
+            add(1, comp_type, lineno, description)
+
             # Count if clauses in comprehension
-            if self.config.get('countComprehensionIf', True):
+            if count_ifs:
                 for if_clause in comp.ifs:
-                    self._add_complexity(1, 'comp_if', node.lineno, 'comprehension if')
+                    add(1, _COMP_IF, lineno, _COMP_IF_DESC)
     
     def visit_Match(self, node):
         """Match statement (Python 3.10+)"""
-        if self.config.get('countMatch', True):
+        if self.cfg.count_match:
+            add = self._add_complexity
+            lineno = node.lineno
             for case in node.cases:
                 # Don't count default case (_)
                 if not isinstance(case.pattern, ast.MatchAs) or case.pattern.name is not None:
-                    self._add_complexity(1, 'match_case', node.lineno, 'match case')
-        self.generic_visit(node)
+                    add(1, _MATCH_CASE, lineno, _MATCH_CASE_DESC)
+
+
+def _make_simple_visitor(type_name: str, description: str, config_key: str):
+    """Build a visit_X method for one SIMPLE_HANDLERS entry"""
+    type_name = sys.intern(type_name)
+    description = sys.intern(description)
+    cfg_field = CONFIG_FIELDS[config_key]
+
+    def visitor(self, node):
+        if getattr(self.cfg, cfg_field):
+            self._add_complexity(1, type_name, getattr(node, 'lineno', 0), description)
+    return visitor
+
+
+# Generate visit_If, visit_While, ... from the registry; count() binds them
+# into the dispatch table, so only decision-point nodes run Python handlers
+for _node_class, (_type_name, _desc, _config_key) in ComplexityCounter.SIMPLE_HANDLERS.items():
+    setattr(ComplexityCounter, f'visit_{_node_class.__name__}',
+            _make_simple_visitor(_type_name, _desc, _config_key))
 
 
 def load_config(file_path: str, preset: Optional[str] = None) -> Dict:
@@ -240,44 +356,63 @@ def load_config(file_path: str, preset: Optional[str] = None) -> Dict:
     return config
 
 
+@functools.lru_cache(maxsize=1024)
+def _find_config_path(directory: str) -> Optional[str]:
+    """Locate .complexity.json at or above a directory (cached per directory)"""
+    # Path.parents walks up to the filesystem root portably (the old
+    # while current_dir != '/' loop never terminated on Windows drives)
+    start = Path(directory)
+    for parent in (start, *start.parents):
+        config_path = parent / '.complexity.json'
+        if config_path.is_file():
+            return str(config_path)
+
+    return None
+
+
+@functools.lru_cache(maxsize=64)
+def _load_config_file(config_path: str, mtime_ns: int) -> Dict:
+    """Parse a config file, cached on (path, mtime)"""
+    with open(config_path, 'r') as f:
+        return json.load(f)
+
+
 def find_project_config(file_path: str) -> Optional[Dict]:
     """Find and load .complexity.json in project directory"""
-    current_dir = os.path.dirname(os.path.abspath(file_path))
-    
-    # Walk up directory tree looking for config
-    while current_dir != '/':
-        config_path = os.path.join(current_dir, '.complexity.json')
-        if os.path.exists(config_path):
-            try:
-                with open(config_path, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Warning: Failed to load {config_path}: {e}", file=sys.stderr)
-                return None
-        
-        parent = os.path.dirname(current_dir)
-        if parent == current_dir:  # Reached root
-            break
-        current_dir = parent
-    
-    return None
+    config_path = _find_config_path(os.path.dirname(os.path.abspath(file_path)))
+    if config_path is None:
+        return None
 
+    try:
+        return _load_config_file(config_path, os.stat(config_path).st_mtime_ns)
+    except Exception as e:
+        print(f"Warning: Failed to load {config_path}: {e}", file=sys.stderr)
+        return None
+
+
+@functools.lru_cache(maxsize=32)
+def _parse(file_path: str, mtime_ns: int, size: int) -> ast.AST:
+    """Parse a file into an AST, cached on (path, mtime, size)"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    return ast.parse(source, filename=file_path)
 
-def analyze_file(file_path: str, config: Optional[Dict] = None) -> Dict[str, Any]:
+
+def analyze_file(file_path: str, config: Optional[Dict] = None,
+                 collect_details: bool = True) -> Dict[str, Any]:
     """Analyze a Python file and return complexity metrics"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            source = f.read()
-        
-        # Parse the source code into an AST
-        tree = ast.parse(source, filename=file_path)
-        
+        # Parse the source code into an AST (cached across repeated calls,
+        # e.g. compare_methods analyzing the same file under several configs)
+        st = os.stat(file_path)
+        tree = _parse(file_path, st.st_mtime_ns, st.st_size)
+
         # Load config if not provided
         if config is None:
             config = load_config(file_path)
         
         # Visit the AST and collect function complexities
-        visitor = ComplexityVisitor(config)
+        visitor = ComplexityVisitor(config, collect_details=collect_details)
         visitor.visit(tree)
         
         return {
@@ -311,6 +446,28 @@ def analyze_file(file_path: str, config: Optional[Dict] = None) -> Dict[str, Any
         }
 
 
+def analyze_files(file_paths: List[str], config: Optional[Dict] = None,
+                  collect_details: bool = True,
+                  workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Analyze many files in parallel, one process per core
+
+    analyze_file is pure CPU (parse + walk) and stateless given a path and
+    config, so files fan out across a ProcessPoolExecutor. Results come
+    back in the same order as file_paths.
+    """
+    file_paths = list(file_paths)
+    if len(file_paths) <= 1:
+        # Not worth spawning workers for a single file
+        return [analyze_file(p, config, collect_details) for p in file_paths]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    worker = functools.partial(analyze_file, config=config,
+                               collect_details=collect_details)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(worker, file_paths, chunksize=8))
+
+
 def format_detailed_output(result: Dict, file_path: str):
     """Format human-readable detailed output"""
     print("\n" + "=" * 70)
@@ -348,7 +505,7 @@ def format_detailed_output(result: Dict, file_path: str):
 def main():
     """Main entry point"""
     if len(sys.argv) < 2:
-        print(json.dumps({
+        print(_dump_json({
             'success': False,
             'error': 'No file path provided',
             'usage': 'python complexity_analyzer.py <file.py> [--details] [--preset=<name>]'
@@ -367,14 +524,14 @@ def main():
     # Load config
     config = load_config(file_path, preset)
     
-    # Analyze
-    result = analyze_file(file_path, config)
+    # Analyze (skip per-decision details unless the caller asked for them)
+    result = analyze_file(file_path, config, collect_details=show_details)
     
     # Output
     if show_details and result.get('success'):
         format_detailed_output(result, file_path)
     else:
-        print(json.dumps(result))
+        print(_dump_json(result))
 
 
 if __name__ == '__main__':